@@ -0,0 +1,42 @@
+//! Build script: compiles the word list into a trie snapshot for the
+//! `embedded-dictionary` feature.
+//!
+//! The snapshot is written with the crate's own `Dictionary` code, so the
+//! embedded bytes always match the format `Dictionary::from_snapshot` reads.
+//! (The `include_bytes!` side lives in `src/embedded.rs`, which this script
+//! must not include.)
+
+#[allow(dead_code, clippy::enum_variant_names)]
+#[path = "src/error.rs"]
+mod error;
+
+#[allow(dead_code)]
+#[path = "src/dictionary.rs"]
+mod dictionary;
+
+use std::env;
+use std::fs;
+use std::path::PathBuf;
+
+/// Word list embedded unless overridden by `SBS_EMBED_DICT`.
+const DEFAULT_DICT_PATH: &str = "data/dictionary.txt";
+
+fn main() {
+    println!("cargo:rerun-if-changed=build.rs");
+    println!("cargo:rerun-if-changed=src/dictionary.rs");
+    println!("cargo:rerun-if-changed=src/error.rs");
+    println!("cargo:rerun-if-env-changed=SBS_EMBED_DICT");
+
+    if env::var_os("CARGO_FEATURE_EMBEDDED_DICTIONARY").is_none() {
+        return;
+    }
+
+    let dict_path = env::var("SBS_EMBED_DICT").unwrap_or_else(|_| DEFAULT_DICT_PATH.to_string());
+    println!("cargo:rerun-if-changed={}", dict_path);
+
+    let dictionary = dictionary::Dictionary::from_file(&dict_path)
+        .unwrap_or_else(|e| panic!("Cannot embed dictionary {}: {}", dict_path, e));
+
+    let out_path = PathBuf::from(env::var_os("OUT_DIR").expect("OUT_DIR is set")).join("trie.bin");
+    fs::write(&out_path, dictionary.to_snapshot()).expect("Failed to write trie snapshot");
+}
@@ -1,9 +1,12 @@
 #!/bin/bash
 # setup_dictionary.sh
 # Downloads a standard English word list for the solver
+# Usage: setup_dictionary.sh [--trie]
+#   --trie  also build the binary trie snapshot (data/dictionary.trie)
 
 DATA_DIR="data"
 DICT_FILE="$DATA_DIR/dictionary.txt"
+TRIE_FILE="$DATA_DIR/dictionary.trie"
 # Using words_alpha.txt (only letters, no numbers/symbols)
 URL="https://raw.githubusercontent.com/dwyl/english-words/master/words_alpha.txt"
 
@@ -23,3 +26,8 @@ else
     fi
     echo "Dictionary downloaded successfully."
 fi
+
+if [ "$1" = "--trie" ]; then
+    echo "Building trie snapshot at $TRIE_FILE..."
+    cargo run --release --bin sbs-build-trie -- "$DICT_FILE" "$TRIE_FILE" || exit 1
+fi
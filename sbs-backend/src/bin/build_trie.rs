@@ -0,0 +1,36 @@
+//! Build a binary trie snapshot from a text word list.
+//!
+//! Usage: `sbs-build-trie [INPUT] [OUTPUT]`
+//! (defaults: `data/dictionary.txt` and `data/dictionary.trie`).
+//!
+//! The snapshot can be passed anywhere a dictionary path is accepted
+//! (`--dictionary`, `SBS_DICT`, the FFI loader); it is detected by its header.
+
+use sbs::Dictionary;
+use std::env;
+use std::fs;
+use std::process;
+
+fn main() {
+    let mut args = env::args().skip(1);
+    let input = args
+        .next()
+        .unwrap_or_else(|| "data/dictionary.txt".to_string());
+    let output = args
+        .next()
+        .unwrap_or_else(|| "data/dictionary.trie".to_string());
+
+    let dictionary = match Dictionary::from_file(&input) {
+        Ok(d) => d,
+        Err(e) => {
+            eprintln!("Dictionary error: {}", e);
+            process::exit(1);
+        }
+    };
+
+    if let Err(e) = fs::write(&output, dictionary.to_snapshot()) {
+        eprintln!("Failed to write {}: {}", output, e);
+        process::exit(1);
+    }
+    eprintln!("Wrote trie snapshot to {}.", output);
+}
@@ -9,13 +9,16 @@ use actix_cors::Cors;
 use actix_web::{get, post, web, App, HttpResponse, HttpServer, Responder};
 #[cfg(feature = "validator")]
 use sbs::create_validator;
-use sbs::{Config, Dictionary, Solver};
+use sbs::{Config, Dictionary, SbsError, Solver};
 use std::env;
-use std::sync::Arc;
+
+#[cfg(feature = "mimalloc")]
+#[global_allocator]
+static GLOBAL: mimalloc::MiMalloc = mimalloc::MiMalloc;
 
 /// Shared application state
 struct AppState {
-    dictionary: Arc<Dictionary>,
+    dictionary: &'static Dictionary,
 }
 
 #[get("/health")]
@@ -40,9 +43,8 @@ async fn solve_puzzle(data: web::Data<AppState>, config_json: web::Json<Config>)
 
     let solver = Solver::new(config);
 
-    match solver.solve(&data.dictionary) {
-        Ok(words) => {
-            let mut sorted: Vec<String> = words.into_iter().collect();
+    match solver.solve(data.dictionary) {
+        Ok(mut sorted) => {
             sorted.sort();
 
             // If a validator is specified, enrich results with definitions and URLs
@@ -88,7 +90,7 @@ async fn solve_stream(data: web::Data<AppState>, config_json: web::Json<Config>)
     let validator_kind = config.validator.clone();
     let api_key = config.api_key.clone();
     let validator_url = config.validator_url.clone();
-    let dictionary = data.dictionary.clone();
+    let dictionary = data.dictionary;
 
     let (tx, rx) = mpsc::unbounded_channel::<String>();
 
@@ -96,9 +98,8 @@ async fn solve_stream(data: web::Data<AppState>, config_json: web::Json<Config>)
     std::thread::spawn(move || {
         let solver = Solver::new(config);
 
-        let words = match solver.solve(&dictionary) {
-            Ok(words) => {
-                let mut sorted: Vec<String> = words.into_iter().collect();
+        let words = match solver.solve(dictionary) {
+            Ok(mut sorted) => {
                 sorted.sort();
                 sorted
             }
@@ -162,15 +163,28 @@ async fn solve_stream(data: web::Data<AppState>, config_json: web::Json<Config>)
         .streaming(event_stream)
 }
 
+/// Load the dictionary from `path`. Without a path, use the embedded word list
+/// if it is compiled in, or `data/dictionary.txt` otherwise.
+fn load_dictionary(path: Option<String>) -> Result<&'static Dictionary, SbsError> {
+    #[cfg(feature = "embedded-dictionary")]
+    if path.is_none() {
+        log::info!("Using embedded dictionary");
+        return Ok(Dictionary::embedded());
+    }
+
+    let path = path.unwrap_or_else(|| "data/dictionary.txt".to_string());
+    log::info!("Loading dictionary from: {}", path);
+    let dictionary = Dictionary::from_file(&path)?;
+    // Shared by all workers for the lifetime of the server
+    Ok(Box::leak(Box::new(dictionary)))
+}
+
 #[actix_web::main]
 async fn main() -> std::io::Result<()> {
     env_logger::init_from_env(env_logger::Env::new().default_filter_or("info"));
 
-    let dict_path = env::var("SBS_DICT").unwrap_or_else(|_| "data/dictionary.txt".to_string());
-
-    log::info!("Loading dictionary from: {}", dict_path);
-    let dictionary = match Dictionary::from_file(&dict_path) {
-        Ok(d) => Arc::new(d),
+    let dictionary = match load_dictionary(env::var("SBS_DICT").ok()) {
+        Ok(d) => d,
         Err(e) => {
             log::error!("Failed to load dictionary: {}", e);
             std::process::exit(1);
@@ -182,9 +196,7 @@ async fn main() -> std::io::Result<()> {
     HttpServer::new(move || {
         let mut app = App::new()
             .wrap(Cors::permissive())
-            .app_data(web::Data::new(AppState {
-                dictionary: dictionary.clone(),
-            }))
+            .app_data(web::Data::new(AppState { dictionary }))
             .service(health)
             .service(solve_puzzle);
 
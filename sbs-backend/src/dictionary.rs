@@ -1,38 +1,91 @@
 //! Dictionary data structure and loading logic.
 
 use crate::error::SbsError;
-use std::collections::HashMap;
-use std::fs::File;
-use std::io::{BufRead, BufReader};
+use std::fs;
 use std::path::Path;
 
+/// Number of letters in the trie alphabet (`a..=z`).
+pub const ALPHABET_SIZE: usize = 26;
+
+/// Longest dictionary word accepted by the loader; longer lines are skipped.
+const MAX_WORD_LEN: usize = 64;
+
+/// Magic bytes opening a binary trie snapshot.
+const SNAPSHOT_MAGIC: &[u8; 4] = b"SBST";
+
+/// Snapshot layout version; bump on any change to the record format.
+const SNAPSHOT_VERSION: u32 = 1;
+
+/// Snapshot header: magic, version and node count.
+const SNAPSHOT_HEADER_LEN: usize = 12;
+
+/// Record bit marking an end-of-word node (bits `0..26` are the child letters).
+const END_OF_WORD_FLAG: u32 = 1 << 31;
+
+/// A set of trie letters: bit `i` stands for `b'a' + i`.
+pub type LetterMask = u32;
+
+/// The mask bit for a lowercase ASCII letter, or `None` for any other char.
+#[inline]
+pub fn letter_bit(ch: char) -> Option<LetterMask> {
+    ch.is_ascii_lowercase().then(|| 1 << (ch as u8 - b'a'))
+}
+
+/// Index of a node in `Dictionary::nodes`.
+pub type NodeId = u32;
+
+/// The root node; it is never anyone's child, so its id doubles as `NIL`.
+pub const ROOT: NodeId = 0;
+
+/// Child slot value for a missing child.
+pub const NIL: NodeId = ROOT;
+
 /// Represents a node in the Trie.
 /// Public so Solver can traverse it.
-#[derive(Default, Debug)]
+///
+/// Children are direct-mapped by letter: slot `i` holds the id of the child
+/// for `b'a' + i`, or `NIL`.
+#[derive(Default, Debug, Clone)]
 pub struct TrieNode {
-    pub children: HashMap<char, TrieNode>,
+    pub children: [NodeId; ALPHABET_SIZE],
     pub is_end_of_word: bool,
+    /// Letters on the edges below this node, i.e. every letter that can still
+    /// be appended on the way to a word stored in this subtree.
+    pub subtree_mask: LetterMask,
 }
 
-impl TrieNode {
-    fn insert(&mut self, word: &str) {
-        let mut node = self;
-        for ch in word.chars() {
-            node = node.children.entry(ch).or_default();
-        }
-        node.is_end_of_word = true;
-    }
+/// Whether a (lowercased) word can be stored in the trie.
+fn is_trie_word(word: &[u8]) -> bool {
+    !word.is_empty() && word.len() <= MAX_WORD_LEN && word.iter().all(u8::is_ascii_lowercase)
+}
+
+/// Trim an (already lowercased) dictionary line.
+/// Returns `None` for lines that are empty, too long, or not purely ASCII letters.
+fn clean_line(line: &[u8]) -> Option<&[u8]> {
+    let line = line.trim_ascii();
+    is_trie_word(line).then_some(line)
+}
+
+fn common_prefix_len(a: &[u8], b: &[u8]) -> usize {
+    a.iter().zip(b).take_while(|(x, y)| x == y).count()
+}
+
+fn snapshot_error(msg: &str) -> SbsError {
+    SbsError::DictionaryError(format!("Invalid trie snapshot: {}.", msg))
 }
 
 /// A read-only container for the word list.
+///
+/// The trie is stored as an arena: all nodes live in one contiguous vector
+/// and refer to their children by index. Node `ROOT` is the root.
 pub struct Dictionary {
-    pub root: TrieNode,
+    pub nodes: Vec<TrieNode>,
 }
 
 impl Dictionary {
     pub fn new() -> Self {
         Self {
-            root: TrieNode::default(),
+            nodes: vec![TrieNode::default()],
         }
     }
 
@@ -45,27 +98,197 @@ impl Dictionary {
             )));
         }
 
-        let file = File::open(path_ref)?;
-        let reader = BufReader::new(file);
-        let mut root = TrieNode::default();
+        let mut data = fs::read(path_ref)?;
+        if data.starts_with(SNAPSHOT_MAGIC) {
+            return Self::from_snapshot(&data);
+        }
+
+        data.make_ascii_lowercase();
+        let words: Vec<&[u8]> = data.split(|&b| b == b'\n').filter_map(clean_line).collect();
+        Ok(Self::from_word_list(words))
+    }
+
+    /// The root node of the trie.
+    #[inline]
+    pub fn root(&self) -> &TrieNode {
+        &self.nodes[ROOT as usize]
+    }
+
+    /// Return the child of `node` for letter index `i`, creating it if needed.
+    #[inline]
+    fn child_or_insert(&mut self, node: NodeId, i: usize) -> NodeId {
+        let child = self.nodes[node as usize].children[i];
+        if child != NIL {
+            return child;
+        }
+        let child = NodeId::try_from(self.nodes.len()).expect("trie exceeds u32 node ids");
+        self.nodes.push(TrieNode::default());
+        self.nodes[node as usize].children[i] = child;
+        child
+    }
+
+    /// Build a trie from sanitized words (lowercase ASCII letter bytes).
+    ///
+    /// The words are sorted first, so consecutive words share their longest
+    /// common prefix: each insertion resumes from the node where the word
+    /// diverges from its predecessor instead of walking down from the root.
+    /// This also allocates nodes in pre-order, keeping subtrees contiguous.
+    fn from_word_list(mut words: Vec<&[u8]>) -> Self {
+        words.sort_unstable();
+        words.dedup();
+
+        // Each word adds one node per letter past its common prefix
+        let mut node_count = 1;
+        let mut prev: &[u8] = &[];
+        for &word in &words {
+            node_count += word.len() - common_prefix_len(prev, word);
+            prev = word;
+        }
+
+        let mut dictionary = Self {
+            nodes: Vec::with_capacity(node_count),
+        };
+        dictionary.nodes.push(TrieNode::default());
+        // path[d] is the node reached by the first d letters of the previous word
+        let mut path: Vec<NodeId> = vec![ROOT];
+        let mut prev: &[u8] = &[];
+        for word in words {
+            let common = common_prefix_len(prev, word);
+            path.truncate(common + 1);
+            let mut node = path[common];
+            for &b in &word[common..] {
+                node = dictionary.child_or_insert(node, (b - b'a') as usize);
+                path.push(node);
+            }
+            dictionary.nodes[node as usize].is_end_of_word = true;
+            prev = word;
+        }
+        dictionary.update_subtree_masks();
+        dictionary
+    }
+
+    /// Recompute `subtree_mask` for every node.
+    ///
+    /// Children are always allocated after their parent, so a single pass in
+    /// reverse index order visits every child before its parent.
+    fn update_subtree_masks(&mut self) {
+        for id in (0..self.nodes.len()).rev() {
+            let mut mask = 0;
+            for (i, &child) in self.nodes[id].children.iter().enumerate() {
+                if child != NIL {
+                    mask |= 1 << i | self.nodes[child as usize].subtree_mask;
+                }
+            }
+            self.nodes[id].subtree_mask = mask;
+        }
+    }
 
-        for line in reader.lines() {
-            let word = line?;
-            let clean_word = word.trim().to_lowercase();
-            if !clean_word.is_empty() && clean_word.chars().all(char::is_alphabetic) {
-                root.insert(&clean_word);
+    /// Append the subtree at `node` to `out` as pre-order records.
+    fn write_snapshot(&self, node: NodeId, out: &mut Vec<u8>) {
+        let node = &self.nodes[node as usize];
+        let mut record = if node.is_end_of_word {
+            END_OF_WORD_FLAG
+        } else {
+            0
+        };
+        for (i, &child) in node.children.iter().enumerate() {
+            if child != NIL {
+                record |= 1 << i;
             }
         }
-        Ok(Self { root })
+        out.extend_from_slice(&record.to_le_bytes());
+
+        for &child in node.children.iter().filter(|&&c| c != NIL) {
+            self.write_snapshot(child, out);
+        }
+    }
+
+    /// Fill the (empty) subtree at `node` from pre-order records written by
+    /// `write_snapshot`, setting `subtree_mask` on the way. Returns that mask.
+    fn read_snapshot<I: Iterator<Item = u32>>(
+        &mut self,
+        node: NodeId,
+        records: &mut I,
+        depth: usize,
+    ) -> Result<LetterMask, SbsError> {
+        let record = records
+            .next()
+            .ok_or_else(|| snapshot_error("truncated node records"))?;
+        if depth > MAX_WORD_LEN || (record & !END_OF_WORD_FLAG) >> ALPHABET_SIZE != 0 {
+            return Err(snapshot_error("malformed node record"));
+        }
+
+        self.nodes[node as usize].is_end_of_word = record & END_OF_WORD_FLAG != 0;
+        let child_letters = record & !END_OF_WORD_FLAG;
+        let mut mask = child_letters;
+        let mut pending = child_letters;
+        while pending != 0 {
+            let i = pending.trailing_zeros() as usize;
+            pending &= pending - 1;
+            let child = self.child_or_insert(node, i);
+            mask |= self.read_snapshot(child, records, depth + 1)?;
+        }
+        self.nodes[node as usize].subtree_mask = mask;
+        Ok(mask)
+    }
+
+    /// Serialize the trie into the binary snapshot format read by `from_snapshot`.
+    ///
+    /// Layout (little-endian): the `SBST` magic, a `u32` format version and a
+    /// `u32` node count, followed by one `u32` record per node in pre-order.
+    /// Bits `0..26` of a record flag which child letters exist and bit 31 marks
+    /// the end of a word, so the structure is implied by the record order.
+    pub fn to_snapshot(&self) -> Vec<u8> {
+        let mut out = Vec::with_capacity(SNAPSHOT_HEADER_LEN + self.nodes.len() * 4);
+        out.extend_from_slice(SNAPSHOT_MAGIC);
+        out.extend_from_slice(&SNAPSHOT_VERSION.to_le_bytes());
+        out.extend_from_slice(&(self.nodes.len() as u32).to_le_bytes());
+        self.write_snapshot(ROOT, &mut out);
+        out
+    }
+
+    /// Load a trie from bytes produced by `to_snapshot`.
+    ///
+    /// Skips the per-line parsing and the walk from the root for every word,
+    /// and allocates the node arena once, so it is considerably faster than
+    /// loading the text word list. Nodes come out in pre-order, which keeps
+    /// each subtree contiguous for the solver's depth-first search.
+    pub fn from_snapshot(bytes: &[u8]) -> Result<Self, SbsError> {
+        if bytes.len() < SNAPSHOT_HEADER_LEN || !bytes.starts_with(SNAPSHOT_MAGIC) {
+            return Err(snapshot_error("missing header"));
+        }
+        let header_u32 = |at: usize| u32::from_le_bytes(bytes[at..at + 4].try_into().unwrap());
+        if header_u32(4) != SNAPSHOT_VERSION {
+            return Err(snapshot_error("unsupported version"));
+        }
+        let body = &bytes[SNAPSHOT_HEADER_LEN..];
+        let count = header_u32(8) as usize;
+        if body.len() != count * 4 {
+            return Err(snapshot_error("node count does not match file size"));
+        }
+
+        let mut dictionary = Self {
+            nodes: Vec::with_capacity(count),
+        };
+        dictionary.nodes.push(TrieNode::default());
+        let mut records = body
+            .chunks_exact(4)
+            .map(|c| u32::from_le_bytes(c.try_into().unwrap()));
+        dictionary.read_snapshot(ROOT, &mut records, 0)?;
+        if records.next().is_some() {
+            return Err(snapshot_error("trailing node records"));
+        }
+        Ok(dictionary)
     }
 
     // Helper for tests
     pub fn from_words(words: &[&str]) -> Self {
-        let mut root = TrieNode::default();
-        for w in words {
-            root.insert(w);
-        }
-        Self { root }
+        let words = words
+            .iter()
+            .map(|w| w.as_bytes())
+            .filter(|w| is_trie_word(w))
+            .collect();
+        Self::from_word_list(words)
     }
 }
 
@@ -74,3 +297,61 @@ impl Default for Dictionary {
         Self::new()
     }
 }
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::{Config, Solver};
+    use std::io::Write;
+
+    #[test]
+    fn test_from_file_normalizes_lines() {
+        let mut tmp = tempfile::NamedTempFile::new().unwrap();
+        write!(tmp, "Cafe\r\n  face \n\nfa-ce\nfac3\ncafé\nbead").unwrap();
+        tmp.flush().unwrap();
+
+        let dict = Dictionary::from_file(tmp.path()).expect("Dictionary failed");
+        let config = Config::new().with_letters("abcdef").with_present("a");
+        let mut results = Solver::new(config).solve(&dict).expect("Solver failed");
+        results.sort();
+
+        assert_eq!(results, vec!["bead", "cafe", "face"]);
+    }
+
+    #[test]
+    fn test_snapshot_roundtrip() {
+        let words = ["bead", "cafe", "face", "faced", "zzzz"];
+        let snapshot = Dictionary::from_words(&words).to_snapshot();
+
+        let mut tmp = tempfile::NamedTempFile::new().unwrap();
+        tmp.write_all(&snapshot).unwrap();
+        tmp.flush().unwrap();
+
+        let dict = Dictionary::from_file(tmp.path()).expect("Snapshot failed");
+        let config = Config::new().with_letters("abcdef").with_present("a");
+        let mut results = Solver::new(config).solve(&dict).expect("Solver failed");
+        results.sort();
+
+        assert_eq!(results, vec!["bead", "cafe", "face", "faced"]);
+        assert_eq!(dict.to_snapshot(), snapshot);
+    }
+
+    #[test]
+    fn test_snapshot_rejects_malformed_input() {
+        let snapshot = Dictionary::from_words(&["cafe", "face"]).to_snapshot();
+
+        assert!(Dictionary::from_snapshot(b"SBST").is_err());
+        assert!(Dictionary::from_snapshot(&snapshot[..snapshot.len() - 4]).is_err());
+
+        let mut bad_version = snapshot.clone();
+        bad_version[4] = 0xff;
+        assert!(Dictionary::from_snapshot(&bad_version).is_err());
+
+        let mut bad_record = snapshot.clone();
+        bad_record[SNAPSHOT_HEADER_LEN + 3] = 0x40;
+        let err = Dictionary::from_snapshot(&bad_record)
+            .err()
+            .expect("malformed record accepted");
+        assert!(err.to_string().contains("malformed node record"));
+    }
+}
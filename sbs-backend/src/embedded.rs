@@ -0,0 +1,19 @@
+//! Word list compiled into the binary (`embedded-dictionary` feature).
+
+use crate::dictionary::Dictionary;
+use std::sync::OnceLock;
+
+/// Trie snapshot written by `build.rs`.
+const EMBEDDED_SNAPSHOT: &[u8] = include_bytes!(concat!(env!("OUT_DIR"), "/trie.bin"));
+
+impl Dictionary {
+    /// The word list compiled into the binary, decoded once on first use.
+    ///
+    /// No file is read at runtime; later calls return the same instance.
+    pub fn embedded() -> &'static Self {
+        static EMBEDDED: OnceLock<Dictionary> = OnceLock::new();
+        EMBEDDED.get_or_init(|| {
+            Self::from_snapshot(EMBEDDED_SNAPSHOT).expect("embedded trie snapshot is valid")
+        })
+    }
+}
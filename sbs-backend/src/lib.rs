@@ -2,6 +2,8 @@
 
 pub mod config;
 pub mod dictionary;
+#[cfg(feature = "embedded-dictionary")]
+mod embedded;
 pub mod error;
 pub mod solver;
 #[cfg(feature = "validator")]
@@ -3,12 +3,16 @@
 use clap::Parser;
 #[cfg(feature = "validator")]
 use sbs::{create_validator, ValidatorKind};
-use sbs::{Config, Dictionary, Solver};
+use sbs::{Config, Dictionary, SbsError, Solver};
 use std::fs::File;
 use std::io::Write;
 use std::path::PathBuf;
 use std::process;
 
+#[cfg(feature = "mimalloc")]
+#[global_allocator]
+static GLOBAL: mimalloc::MiMalloc = mimalloc::MiMalloc;
+
 #[derive(Parser, Debug)]
 #[command(name = "sbs")]
 #[command(version)]
@@ -137,7 +141,7 @@ fn main() {
         process::exit(1);
     }
 
-    let dictionary = match Dictionary::from_file(&config.dictionary) {
+    let dictionary = match load_dictionary(&config) {
         Ok(d) => d,
         Err(e) => {
             eprintln!("Dictionary error: {}", e);
@@ -157,9 +161,8 @@ fn main() {
         process::exit(1);
     }
 
-    match solver.solve(&dictionary) {
-        Ok(words) => {
-            let mut sorted_words: Vec<_> = words.into_iter().collect();
+    match solver.solve(dictionary) {
+        Ok(mut sorted_words) => {
             sorted_words.sort();
 
             #[cfg(feature = "validator")]
@@ -208,6 +211,19 @@ fn main() {
     }
 }
 
+/// Load the configured dictionary. With the `embedded-dictionary` feature,
+/// the compiled-in word list stands in for the default dictionary path.
+fn load_dictionary(config: &Config) -> Result<&'static Dictionary, SbsError> {
+    #[cfg(feature = "embedded-dictionary")]
+    if config.dictionary == Config::default().dictionary {
+        return Ok(Dictionary::embedded());
+    }
+
+    let dictionary = Dictionary::from_file(&config.dictionary)?;
+    // Used until the process exits
+    Ok(Box::leak(Box::new(dictionary)))
+}
+
 fn format_unvalidated(words: &[String], format: &str) -> String {
     match format {
         "json" => serde_json::to_string_pretty(words).unwrap(),
@@ -1,25 +1,42 @@
 //! The algorithmic core: Trie-based solver.
 
 use crate::config::Config;
-use crate::dictionary::{Dictionary, TrieNode};
+use crate::dictionary::{
+    letter_bit, Dictionary, LetterMask, NodeId, TrieNode, ALPHABET_SIZE, NIL, ROOT,
+};
 use crate::error::SbsError;
-use std::collections::{HashMap, HashSet};
+use rayon::prelude::*;
+
+/// Initial result capacity for each starting letter's search; typical
+/// puzzles yield at most a few hundred words per letter.
+const RESULTS_CAPACITY_PER_LETTER: usize = 256;
 
 pub struct Solver {
     config: Config,
 }
 
-/// Context struct to reduce argument count in recursion
+/// Context struct to reduce argument count in the search
 struct SearchContext<'a> {
-    allowed: &'a HashSet<char>,
-    anywhere: &'a HashSet<char>,
-    required: &'a HashSet<char>,
-    required_start: Option<char>,
-    case_sensitive: bool,
+    nodes: &'a [TrieNode],
+    /// Letters allowed at position 0
+    start: LetterMask,
+    /// Letters allowed at any later position
+    anywhere: LetterMask,
+    required: LetterMask,
     min_len: usize,
     max_len: usize,
     max_repeats: Option<usize>,
-    results: &'a mut HashSet<String>,
+    char_counts: [usize; ALPHABET_SIZE],
+    results: &'a mut Vec<String>,
+}
+
+/// A node on the explicit depth-first search stack.
+struct Frame {
+    node: NodeId,
+    /// Usable letters not yet tried below this node
+    pending: LetterMask,
+    /// Letters used by the word leading to this node
+    word_mask: LetterMask,
 }
 
 impl Solver {
@@ -27,7 +44,7 @@ impl Solver {
         Self { config }
     }
 
-    pub fn solve(&self, dictionary: &Dictionary) -> Result<HashSet<String>, SbsError> {
+    pub fn solve(&self, dictionary: &Dictionary) -> Result<Vec<String>, SbsError> {
         let case_sensitive = self.config.case_sensitive.unwrap_or(false);
 
         let letters_str = self
@@ -43,135 +60,207 @@ impl Solver {
         let max_len = self.config.maximal_word_length.unwrap_or(usize::MAX);
         let max_repeats = self.config.repeats;
 
-        let (allowed_chars, anywhere_chars, required_chars, required_start) = if case_sensitive {
+        // Letters outside `a..=z` never occur in the trie: as available letters
+        // they are simply unusable, as required letters they rule out every word.
+        let mut satisfiable = true;
+
+        let (start, anywhere, required) = if case_sensitive {
             // Uppercase letters in `letters` can only appear at position 0
-            let mut start_only: HashSet<char> = HashSet::new();
-            let mut anywhere: HashSet<char> = HashSet::new();
+            let mut start_only: LetterMask = 0;
+            let mut anywhere: LetterMask = 0;
             for ch in letters_str.chars() {
                 if ch.is_uppercase() {
-                    start_only.insert(ch.to_lowercase().next().unwrap());
+                    start_only |= letter_bit(ch.to_lowercase().next().unwrap()).unwrap_or(0);
                 } else {
-                    anywhere.insert(ch);
+                    anywhere |= letter_bit(ch).unwrap_or(0);
                 }
             }
-            let allowed: HashSet<char> = start_only.union(&anywhere).copied().collect();
+            let allowed = start_only | anywhere;
 
             // Uppercase in `present` means required at start (max 1)
-            let mut req_start: Option<char> = None;
-            let mut required: HashSet<char> = HashSet::new();
+            let mut req_start: Option<LetterMask> = None;
+            let mut required: LetterMask = 0;
             for ch in required_str.chars() {
-                if ch.is_uppercase() {
-                    let lower = ch.to_lowercase().next().unwrap();
-                    if req_start.is_some() {
-                        return Err(SbsError::ConfigError(
-                            "At most one uppercase required letter allowed in case-sensitive mode"
-                                .to_string(),
-                        ));
+                let upper = ch.is_uppercase();
+                if upper && req_start.is_some() {
+                    return Err(SbsError::ConfigError(
+                        "At most one uppercase required letter allowed in case-sensitive mode"
+                            .to_string(),
+                    ));
+                }
+                match letter_bit(ch.to_lowercase().next().unwrap()) {
+                    Some(bit) => {
+                        if upper {
+                            req_start = Some(bit);
+                        }
+                        required |= bit;
+                    }
+                    None => {
+                        if upper {
+                            req_start = Some(0);
+                        }
+                        satisfiable = false;
                     }
-                    req_start = Some(lower);
-                    required.insert(lower);
-                } else {
-                    required.insert(ch);
                 }
             }
 
-            (allowed, anywhere, required, req_start)
+            let start = req_start.map_or(allowed, |bit| allowed & bit);
+            (start, anywhere, required)
         } else {
-            let lowered = letters_str.to_lowercase();
-            let allowed: HashSet<char> = lowered.chars().collect();
-            let anywhere = allowed.clone();
-            let required: HashSet<char> = required_str.to_lowercase().chars().collect();
-            (allowed, anywhere, required, None)
-        };
-
-        let mut results = HashSet::new();
-
-        let mut ctx = SearchContext {
-            allowed: &allowed_chars,
-            anywhere: &anywhere_chars,
-            required: &required_chars,
-            required_start,
-            case_sensitive,
-            min_len,
-            max_len,
-            max_repeats,
-            results: &mut results,
+            let mut allowed: LetterMask = 0;
+            for ch in letters_str.to_lowercase().chars() {
+                allowed |= letter_bit(ch).unwrap_or(0);
+            }
+            let mut required: LetterMask = 0;
+            for ch in required_str.to_lowercase().chars() {
+                match letter_bit(ch) {
+                    Some(bit) => required |= bit,
+                    None => satisfiable = false,
+                }
+            }
+            (allowed, allowed, required)
         };
 
-        let mut char_counts = HashMap::new();
+        if !satisfiable {
+            return Ok(Vec::new());
+        }
 
-        Self::find_words(&dictionary.root, String::new(), &mut char_counts, &mut ctx);
+        // Words with different first letters live in disjoint subtries, so
+        // search each starting letter independently in parallel.
+        let results = (0..ALPHABET_SIZE)
+            .into_par_iter()
+            .filter(|&i| start & 1 << i != 0)
+            .flat_map_iter(|i| {
+                let mut results = Vec::with_capacity(RESULTS_CAPACITY_PER_LETTER);
+                let mut ctx = SearchContext {
+                    nodes: &dictionary.nodes,
+                    start: 1 << i,
+                    anywhere,
+                    required,
+                    min_len,
+                    max_len,
+                    max_repeats,
+                    char_counts: [0; ALPHABET_SIZE],
+                    results: &mut results,
+                };
+
+                Self::find_words(&mut ctx);
+                results
+            })
+            .collect();
 
         Ok(results)
     }
 
-    fn find_words(
-        node: &TrieNode,
-        current_word: String,
-        char_counts: &mut HashMap<char, usize>,
-        ctx: &mut SearchContext,
-    ) {
-        if current_word.len() > ctx.max_len {
-            return;
-        }
-
-        // Check Valid Word
-        if node.is_end_of_word && current_word.len() >= ctx.min_len {
-            let mut all_req_present = true;
-            for req in ctx.required {
-                if *char_counts.get(req).unwrap_or(&0) == 0 {
-                    all_req_present = false;
-                    break;
+    /// Depth-first search of the trie, driven by an explicit stack of frames
+    /// instead of recursion. `word` and the repeat counts are extended when a
+    /// child is entered and restored when its frame is popped.
+    fn find_words(ctx: &mut SearchContext) {
+        let nodes = ctx.nodes;
+        let depth_hint = ctx.max_len.min(32);
+        let mut word: Vec<u8> = Vec::with_capacity(depth_hint);
+        let mut stack: Vec<Frame> = Vec::with_capacity(depth_hint + 1);
+
+        Self::enter(ROOT, 0, &word, &mut stack, ctx);
+
+        while let Some(frame) = stack.last_mut() {
+            if frame.pending == 0 {
+                // Backtrack out of this node
+                stack.pop();
+                if let Some(b) = word.pop() {
+                    ctx.char_counts[(b - b'a') as usize] -= 1;
                 }
+                continue;
             }
-            // If case-sensitive and required_start is set, first char must match
-            if all_req_present {
-                if let Some(start_char) = ctx.required_start {
-                    if !current_word.starts_with(start_char) {
-                        all_req_present = false;
-                    }
-                }
+
+            let i = frame.pending.trailing_zeros() as usize;
+            frame.pending &= frame.pending - 1;
+            let word_mask = frame.word_mask | 1 << i;
+
+            let child = nodes[frame.node as usize].children[i];
+            if child == NIL {
+                continue;
             }
-            if all_req_present {
-                ctx.results.insert(current_word.clone());
+
+            // Prune subtrees that cannot supply the missing required letters
+            let reachable = word_mask | nodes[child as usize].subtree_mask;
+            if reachable & ctx.required != ctx.required {
+                continue;
             }
-        }
 
-        let depth = current_word.len();
-
-        // Recursive Backtracking
-        for (ch, next_node) in &node.children {
-            // In case-sensitive mode, start-only chars can only appear at depth 0
-            let char_allowed = if ctx.case_sensitive && depth > 0 {
-                ctx.anywhere.contains(ch)
-            } else {
-                ctx.allowed.contains(ch)
-            };
-
-            if char_allowed {
-                // Check repetition limit
-                let count = *char_counts.get(ch).unwrap_or(&0);
-                if let Some(limit) = ctx.max_repeats {
-                    if count >= limit {
-                        continue;
-                    }
+            // Check repetition limit
+            if let Some(limit) = ctx.max_repeats {
+                if ctx.char_counts[i] >= limit {
+                    continue;
                 }
+            }
 
-                let mut next_word = current_word.clone();
-                next_word.push(*ch);
-                *char_counts.entry(*ch).or_insert(0) += 1;
-
-                Self::find_words(next_node, next_word, char_counts, ctx);
+            word.push(b'a' + i as u8);
+            ctx.char_counts[i] += 1;
 
-                *char_counts.entry(*ch).or_insert(0) -= 1;
+            if !Self::enter(child, word_mask, &word, &mut stack, ctx) {
+                ctx.char_counts[i] -= 1;
+                word.pop();
             }
         }
     }
+
+    /// Record `word` if it ends at `node` and qualifies, then push a frame to
+    /// explore the children of `node`. Returns `false` (pushing nothing) when
+    /// `word` is already at the maximal length.
+    #[inline]
+    fn enter(
+        node: NodeId,
+        word_mask: LetterMask,
+        word: &[u8],
+        stack: &mut Vec<Frame>,
+        ctx: &mut SearchContext,
+    ) -> bool {
+        // Check Valid Word
+        if ctx.nodes[node as usize].is_end_of_word
+            && word.len() >= ctx.min_len
+            && word_mask & ctx.required == ctx.required
+        {
+            // Every trie path is visited once, so results are unique
+            // SAFETY: `word` only ever receives bytes `b'a' + i` with `i < 26`,
+            // which are ASCII and therefore valid UTF-8.
+            let found = unsafe { String::from_utf8_unchecked(word.to_vec()) };
+            ctx.results.push(found);
+        }
+
+        // Never descend past the maximal length, so `word` never exceeds it
+        if word.len() >= ctx.max_len {
+            return false;
+        }
+
+        // In case-sensitive mode, start-only letters can only appear at depth 0
+        let pending = if word.is_empty() {
+            ctx.start
+        } else {
+            ctx.anywhere
+        };
+        stack.push(Frame {
+            node,
+            pending,
+            word_mask,
+        });
+        true
+    }
 }
 
 #[cfg(test)]
 mod tests {
     use super::*;
+    use std::collections::HashSet;
+
+    /// Solve and collect the words into a set for membership checks.
+    fn solve_set(solver: &Solver, dict: &Dictionary) -> HashSet<String> {
+        solver
+            .solve(dict)
+            .expect("Solver failed")
+            .into_iter()
+            .collect()
+    }
 
     #[test]
     fn test_solver_basic() {
@@ -180,7 +269,7 @@ mod tests {
         let solver = Solver::new(config);
         let dict = Dictionary::from_words(&["bad", "fade", "faced", "zzzz", "bed"]);
 
-        let results = solver.solve(&dict).expect("Solver failed");
+        let results = solve_set(&solver, &dict);
 
         assert!(results.contains("fade"));
         assert!(results.contains("faced"));
@@ -195,7 +284,7 @@ mod tests {
         let solver = Solver::new(config);
         let dict = Dictionary::from_words(&["fade", "faced", "bead", "cafe", "face"]);
 
-        let results = solver.solve(&dict).expect("Solver failed");
+        let results = solve_set(&solver, &dict);
 
         assert!(results.contains("fade"), "contains both a and f");
         assert!(results.contains("faced"), "contains both a and f");
@@ -212,7 +301,7 @@ mod tests {
         let solver = Solver::new(config);
         let dict = Dictionary::from_words(&["abcd", "abcde", "ace", "abcdef"]);
 
-        let results = solver.solve(&dict).expect("Solver failed");
+        let results = solve_set(&solver, &dict);
 
         assert!(
             !results.contains("abcd"),
@@ -234,7 +323,7 @@ mod tests {
         let solver = Solver::new(config);
         let dict = Dictionary::from_words(&["ab", "abc", "abcd", "abcde"]);
 
-        let results = solver.solve(&dict).expect("Solver failed");
+        let results = solve_set(&solver, &dict);
 
         assert!(
             results.contains("abcd"),
@@ -255,7 +344,7 @@ mod tests {
         let solver = Solver::new(config);
         let dict = Dictionary::from_words(&["ab", "abc", "abcd", "abcde"]);
 
-        let results = solver.solve(&dict).expect("Solver failed");
+        let results = solve_set(&solver, &dict);
 
         assert!(!results.contains("ab"), "2-letter word excluded");
         assert!(results.contains("abc"), "3-letter word included");
@@ -270,7 +359,7 @@ mod tests {
         let solver = Solver::new(config);
         let dict = Dictionary::from_words(&["ab", "abc", "abcd", "abcde"]);
 
-        let results = solver.solve(&dict).expect("Solver failed");
+        let results = solve_set(&solver, &dict);
 
         assert!(
             !results.contains("ab"),
@@ -295,7 +384,7 @@ mod tests {
         let solver = Solver::new(config);
         let dict = Dictionary::from_words(&["aa", "ab"]);
 
-        let results = solver.solve(&dict).expect("Solver failed");
+        let results = solve_set(&solver, &dict);
 
         assert!(results.contains("ab"), "Result should contain 'ab'");
         assert!(
@@ -314,7 +403,7 @@ mod tests {
         let solver = Solver::new(config);
         let dict = Dictionary::from_words(&["fade", "faced", "bad"]);
 
-        let results = solver.solve(&dict).expect("Solver failed");
+        let results = solve_set(&solver, &dict);
 
         assert!(
             results.contains("fade"),
@@ -338,7 +427,7 @@ mod tests {
         // "area" has no w — OK (w is not required)
         let dict = Dictionary::from_words(&["war", "raw", "ware", "area", "aw"]);
 
-        let results = solver.solve(&dict).expect("Solver failed");
+        let results = solve_set(&solver, &dict);
 
         assert!(results.contains("war"), "w at position 0 is allowed");
         assert!(!results.contains("raw"), "w at position > 0 is not allowed");
@@ -359,7 +448,7 @@ mod tests {
         let solver = Solver::new(config);
         let dict = Dictionary::from_words(&["war", "raw", "ware", "area", "era"]);
 
-        let results = solver.solve(&dict).expect("Solver failed");
+        let results = solve_set(&solver, &dict);
 
         assert!(
             results.contains("war"),
@@ -381,7 +470,7 @@ mod tests {
         let solver = Solver::new(config);
         let dict = Dictionary::from_words(&["war", "raw", "ware", "awe"]);
 
-        let results = solver.solve(&dict).expect("Solver failed");
+        let results = solve_set(&solver, &dict);
 
         // Both 'W' (start-only) and 'w' (anywhere) contribute to allowed.
         // 'w' (lowercase) is in anywhere, so w can appear at any position.
@@ -401,7 +490,7 @@ mod tests {
         let dict =
             Dictionary::from_words(&["awls", "laws", "slaw", "wall", "walls", "walrus", "lure"]);
 
-        let results = solver.solve(&dict).expect("Solver failed");
+        let results = solve_set(&solver, &dict);
 
         assert!(!results.contains("awls"), "awls does not start with w");
         assert!(!results.contains("laws"), "laws does not start with w");
@@ -434,7 +523,7 @@ mod tests {
         let solver = Solver::new(config);
         let dict = Dictionary::from_words(&["awls", "laws", "wall", "walrus"]);
 
-        let results = solver.solve(&dict).expect("Solver failed");
+        let results = solve_set(&solver, &dict);
 
         assert!(
             results.contains("awls"),
@@ -471,7 +560,7 @@ mod tests {
         config.minimal_word_length = Some(1);
         let solver = Solver::new(config);
         let dict = Dictionary::from_words(&["a", "ab", "ba", "b", "abc", "ca"]);
-        let result = solver.solve(&dict).unwrap();
+        let result = solve_set(&solver, &dict);
         // All words using only a and b should match
         assert!(result.contains("a"));
         assert!(result.contains("ab"));
@@ -481,4 +570,29 @@ mod tests {
         assert!(!result.contains("abc"));
         assert!(!result.contains("ca"));
     }
+
+    #[test]
+    fn test_solver_non_letter_required_matches_nothing() {
+        let mut config = Config::new().with_letters("ab1").with_present("a1");
+        config.minimal_word_length = Some(1);
+        let solver = Solver::new(config);
+        let dict = Dictionary::from_words(&["a", "ab", "ba"]);
+        let result = solver.solve(&dict).unwrap();
+        assert!(result.is_empty(), "no dictionary word can contain '1'");
+    }
+
+    #[test]
+    fn test_solver_results_unique() {
+        let mut config = Config::new().with_letters("Wware").with_present("a");
+        config.case_sensitive = Some(true);
+        config.minimal_word_length = Some(3);
+
+        let solver = Solver::new(config);
+        let dict = Dictionary::from_words(&["war", "ware", "war", "awe"]);
+
+        let mut results = solver.solve(&dict).expect("Solver failed");
+        results.sort();
+
+        assert_eq!(results, vec!["awe", "war", "ware"]);
+    }
 }
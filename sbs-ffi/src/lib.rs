@@ -100,8 +100,7 @@ pub unsafe extern "C" fn sbs_solve(
 
     let solver = Solver::new(config);
     match solver.solve(dict) {
-        Ok(words) => {
-            let mut sorted: Vec<String> = words.into_iter().collect();
+        Ok(mut sorted) => {
             sorted.sort();
             let result = serde_json::json!({ "words": sorted });
             to_c_string(&result.to_string())